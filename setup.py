@@ -13,6 +13,7 @@ setup(name='tap-criteo',
       python_requires='>=3.6',
       install_requires=[
           'singer-python==5.9.0',
+          'backoff==1.8.0',
           'criteo-marketing==1.0.159'
       ],
       extras_require={
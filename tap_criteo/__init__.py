@@ -1,30 +1,92 @@
 """Singer Tap to pull data from Criteo Marketing API."""
+import argparse
 import json
 
 import singer
 from singer import utils
+from singer.catalog import Catalog
 from tap_criteo.discover import do_discover
-from tap_criteo.sync import do_sync
+from tap_criteo.sync import do_explain, do_sync
 
 
-REQUIRED_CONFIG_KEYS = ["start_date", "client_id", "client_secret"]
+REQUIRED_CONFIG_KEYS = ["start_date"]
+# Credentials are either given once or for each entry of "accounts"
+CREDENTIAL_KEYS = ["client_id", "client_secret"]
 
 LOGGER = singer.get_logger()
 
 
+def parse_args():
+    """Parse the standard Singer arguments plus --explain.
+
+    Mirrors singer.utils.parse_args, which cannot be given extra arguments.
+    """
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-c", "--config", help="Config file", required=True)
+    parser.add_argument("-s", "--state", help="State file")
+    parser.add_argument(
+        "-p",
+        "--properties",
+        help="Property selections: DEPRECATED, Please use --catalog instead",
+    )
+    parser.add_argument("--catalog", help="Catalog file")
+    parser.add_argument(
+        "-d", "--discover", action="store_true", help="Do schema discovery"
+    )
+    parser.add_argument(
+        "--explain",
+        action="store_true",
+        help="Print the sync plan and expected API calls, then exit",
+    )
+
+    args = parser.parse_args()
+    if args.explain and not args.catalog:
+        parser.error("--explain requires --catalog")
+    args.config_path = args.config
+    args.config = utils.load_json(args.config)
+    if args.state:
+        args.state_path = args.state
+        args.state = utils.load_json(args.state)
+    else:
+        args.state = {}
+    if args.properties:
+        args.properties_path = args.properties
+        args.properties = utils.load_json(args.properties)
+    if args.catalog:
+        args.catalog_path = args.catalog
+        args.catalog = Catalog.load(args.catalog)
+
+    utils.check_config(args.config, REQUIRED_CONFIG_KEYS)
+    accounts = args.config.get("accounts") or [args.config]
+    for account in accounts:
+        utils.check_config(account, CREDENTIAL_KEYS)
+    # Names key each account's bookmarks, token and rate limit
+    names = [account.get("name", account["client_id"]) for account in accounts]
+    if len(set(names)) != len(names):
+        raise Exception(
+            "Config accounts must have unique names, give accounts which "
+            "share a client_id a name"
+        )
+    return args
+
+
 @utils.handle_top_exception(LOGGER)
 def main():
     """CLI for Singer Tap."""
     # Parse command line arguments
-    args = utils.parse_args(REQUIRED_CONFIG_KEYS)
+    args = parse_args()
 
     # If discover flag was passed, run discovery mode and dump output to stdout
     if args.discover:
         catalog = do_discover()
         print(json.dumps(catalog, indent=2))
+    # If explain flag was passed, describe the sync without running it
+    elif args.explain:
+        plan = do_explain(args.config, args.state, args.catalog)
+        print(json.dumps(plan, indent=2))
     # Otherwise run in sync mode
     elif args.catalog:
-        do_sync(args.config, args.state, catalog)
+        do_sync(args.config, args.state, args.catalog)
 
 
 if __name__ == "__main__":
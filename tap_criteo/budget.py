@@ -0,0 +1,40 @@
+"""Wall-clock budget for a run of the tap."""
+import time
+
+
+class RunBudget:
+    """Time a run may spend, counted from when the budget is created."""
+
+    def __init__(self, seconds):
+        """Allow the run to take up to seconds from now."""
+        self.deadline = time.monotonic() + seconds
+
+    def remaining(self):
+        """Return the number of seconds left, negative once overrun."""
+        return self.deadline - time.monotonic()
+
+    def allows(self, seconds=0.0):
+        """Return True if work expected to take seconds still fits."""
+        return self.remaining() > seconds
+
+
+class BudgetedDays:
+    """Iterate over days until an average day no longer fits the budget."""
+
+    def __init__(self, days, budget):
+        """Wrap an iterable of days with a RunBudget."""
+        self.days = days
+        self.budget = budget
+        self.stopped_at = None
+
+    def __iter__(self):
+        """Yield days, setting stopped_at to the first day not yielded."""
+        started = time.monotonic()
+        days_done = 0
+        for day in self.days:
+            day_seconds = (time.monotonic() - started) / max(days_done, 1)
+            if not self.budget.allows(day_seconds):
+                self.stopped_at = day
+                return
+            yield day
+            days_done += 1
@@ -0,0 +1,51 @@
+"""Column-at-a-time conversion of Criteo Statistics reports."""
+
+
+def get_column_type(schema):
+    """Return the first non-null JSON Schema type of a column schema."""
+    types = schema.get("type", [])
+    if isinstance(types, str):
+        types = [types]
+    types = [typ for typ in types if typ != "null"]
+    return types[0] if types else None
+
+
+def convert_column(values, schema, transformer):
+    """Convert a column of CSV strings to the types of its schema."""
+    typ = get_column_type(schema)
+    if typ == "string" and "format" not in schema:
+        # Transformer output would be identical to the CSV value
+        return list(values)
+
+    # Reports repeat few distinct dimension values (e.g. a single Day), so
+    # each distinct value only goes through the Transformer once
+    cache = {}
+    converted = []
+    for value in values:
+        if value not in cache:
+            cache[value] = transformer.transform(value, schema)
+        converted.append(cache[value])
+    return converted
+
+
+def convert_columns(columns, schema, transformer):
+    """Convert each column of a report to the types of the stream schema."""
+    properties = schema["properties"]
+    return {
+        field: convert_column(values, properties[field], transformer)
+        for field, values in columns.items()
+    }
+
+
+def record_batches(columns, row_count, constants, batch_size):
+    """Yield lists of records assembled from typed columns."""
+    fields = list(columns) + list(constants)
+    constant_values = list(constants.values())
+    for offset in range(0, row_count, batch_size):
+        column_slices = [
+            values[offset : offset + batch_size] for values in columns.values()
+        ]
+        yield [
+            dict(zip(fields, list(row) + constant_values))
+            for row in zip(*column_slices)
+        ]
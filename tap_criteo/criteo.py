@@ -1,9 +1,13 @@
 """Functions to interact with Criteo Marketing API."""
+import threading
 import time
 
+import backoff
 import criteo_marketing
 from criteo_marketing.rest import ApiException
 import singer
+from tap_criteo import exporter
+from tap_criteo.hedge import Hedger
 
 
 LOGGER = singer.get_logger()
@@ -16,11 +20,13 @@ FORMAT = (
     "Csv"  # Hardcoded to Csv since all records converted to Singer spec JSON
 )
 TOKEN_EXPIRE = (
-    0  # Unix timestamp at which the current auth token expires (seconds)
+    {}  # Unix timestamp at which each account's token expires (seconds)
 )
 TOKEN_REFRESH_MARGIN = (
     60  # Maximum number of seconds before token expiry to get new token
 )
+RATE_LIMITERS = {}  # RateLimiter for each account with a request rate set
+HEDGERS = {}  # Hedger of Statistics requests for each account hedging them
 
 
 # Return unix timestamp to the nearest second
@@ -29,6 +35,32 @@ def get_unixtime():
     return int(time.time())
 
 
+class RateLimiter:
+    """Space out requests made with one set of credentials."""
+
+    def __init__(self, requests_per_second):
+        """Allow at most requests_per_second requests."""
+        self.interval = 1.0 / requests_per_second
+        self.next_request = 0.0
+        self.lock = threading.Lock()
+
+    def wait(self):
+        """Sleep until the next request is allowed."""
+        with self.lock:
+            now = time.monotonic()
+            delay = self.next_request - now
+            self.next_request = max(now, self.next_request) + self.interval
+        if delay > 0:
+            time.sleep(delay)
+
+
+def throttle(client):
+    """Wait for the rate limit of the client's credentials, if any."""
+    rate_limiter = RATE_LIMITERS.get(client.account_name)
+    if rate_limiter:
+        rate_limiter.wait()
+
+
 def create_sdk_client(config):
     """Create an interface to Criteo Marketing API."""
     LOGGER.info("Creating Criteo Marketing API client with OAuth credentials")
@@ -40,28 +72,54 @@ def create_sdk_client(config):
     # logging.basicConfig(level=logging.DEBUG)
     # configuration.debug = True
 
-    return criteo_marketing.ApiClient(configuration)
+    client = criteo_marketing.ApiClient(configuration)
+    # Accounts may share a client_id, so per-account state is keyed by name
+    client.account_name = config.get("account_name", config["client_id"])
+    if config.get("requests_per_second"):
+        RATE_LIMITERS[client.account_name] = RateLimiter(
+            float(config["requests_per_second"])
+        )
+    if config.get("hedge_percentile"):
+        hedge_percentile = float(config["hedge_percentile"])
+        if not 0 < hedge_percentile <= 100:
+            raise ValueError(
+                "hedge_percentile must be above 0 and at most 100, got %s"
+                % config["hedge_percentile"]
+            )
+        HEDGERS[client.account_name] = Hedger(
+            hedge_percentile,
+            int(config.get("hedge_max_requests", "10")),
+            endpoint="StatisticsApi",
+        )
+
+    return client
 
 
 def get_auth_token(client):
     """Authenticate with Criteo Marketing API and return acccess token."""
     LOGGER.info("Getting OAuth token")
     auth_api = criteo_marketing.AuthenticationApi()
-    with singer.metrics.http_request_timer("Authentication"):
+    throttle(client)
+    exporter.REGISTRY.inc("token_refreshes_total")
+    with exporter.http_request_timer("Authentication"):
         auth_response = auth_api.o_auth2_token_post(
             client_id=client.configuration.username,
             client_secret=client.configuration.password,
             grant_type=GRANT_TYPE,
         )
-    global TOKEN_EXPIRE
-    TOKEN_EXPIRE = get_unixtime() + auth_response.expires_in
+    TOKEN_EXPIRE[client.account_name] = (
+        get_unixtime() + auth_response.expires_in
+    )
     # Token type is always "BEARER"
     return auth_response.token_type + " " + auth_response.access_token
 
 
 def refresh_auth_token(client, token):
     """Refresh Criteo Marketing API access token if it expires soon."""
-    time_to_expire = TOKEN_EXPIRE - TOKEN_REFRESH_MARGIN
+    time_to_expire = (
+        TOKEN_EXPIRE.get(client.account_name, 0)
+        - TOKEN_REFRESH_MARGIN
+    )
     if time_to_expire <= get_unixtime():
         # Don't log time to expire on if no token provided
         if token:
@@ -79,7 +137,19 @@ def exception_is_4xx(exception):
     return 400 <= exception.status < 500
 
 
-@singer.utils.backoff((ApiException,), exception_is_4xx)
+def retry_api_errors(func):
+    """Retry non-4xx API errors up to 5 times with exponential backoff."""
+    return backoff.on_exception(
+        backoff.expo,
+        (ApiException,),
+        max_tries=5,
+        giveup=exception_is_4xx,
+        factor=2,
+        on_backoff=exporter.count_retry,
+    )(func)
+
+
+@retry_api_errors
 def get_statistics_report(client, stats_query, token=None):
     """Get Statistics Report from Criteo Marketing API endpoint."""
     token = token or get_auth_token(client)
@@ -88,24 +158,33 @@ def get_statistics_report(client, stats_query, token=None):
     stats_api = criteo_marketing.StatisticsApi(client)
     stats_query_message = criteo_marketing.StatsQueryMessageEx(**stats_query)
 
-    return stats_api.get_stats(token, stats_query_message)
+    def request():
+        return stats_api.get_stats(token, stats_query_message)
+
+    hedger = HEDGERS.get(client.account_name)
+    if hedger:
+        return hedger.call(request, throttle=lambda: throttle(client))
+    throttle(client)
+    return request()
 
 
-@singer.utils.backoff((ApiException,), exception_is_4xx)
+@retry_api_errors
 def get_audiences_endpoint(client, advertiser_id, token=None):
     """Get Audiences for an Advertiser from Criteo Marketing API."""
     token = token or get_auth_token(client)
     api_instance = criteo_marketing.AudiencesApi(client)
+    throttle(client)
     return api_instance.get_audiences(token, advertiser_id=advertiser_id)
 
 
-@singer.utils.backoff((ApiException,), exception_is_4xx)
+@retry_api_errors
 def get_generic_endpoint(
     client, module, method, advertiser_ids=None, token=None
 ):
     """Get objects from Criteo Marketing API for a selection of Avertisers."""
     token = token or get_auth_token(client)
     api_instance = getattr(criteo_marketing, module)(client)
+    throttle(client)
     if advertiser_ids:
         return getattr(api_instance, method)(
             token, advertiser_ids=advertiser_ids
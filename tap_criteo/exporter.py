@@ -0,0 +1,267 @@
+"""Opt-in export of live sync metrics in Prometheus text format."""
+import collections
+import contextlib
+import os
+import threading
+import time
+
+import singer
+from singer import metrics
+
+
+LOGGER = singer.get_logger()
+
+METRIC_PREFIX = "tap_criteo_"
+RATE_WINDOW = 60  # Seconds over which records per second are averaged
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+HELP = {
+    "records_total": ("counter", "Records written per stream and account."),
+    "records_per_second": (
+        "gauge",
+        "Records written per second over the last minute.",
+    ),
+    "request_duration_seconds": (
+        "histogram",
+        "Criteo Marketing API request latency per endpoint.",
+    ),
+    "bytes_received_total": (
+        "counter",
+        "Bytes of Statistics reports received per stream and account.",
+    ),
+    "token_refreshes_total": ("counter", "OAuth tokens requested."),
+    "retries_total": ("counter", "Requests retried after an API error."),
+    "hedged_requests_total": (
+        "counter",
+        "Duplicate requests sent for slow calls, by which one won.",
+    ),
+}
+
+
+class RateWindow:
+    """Count of events in one-second buckets over a rolling window."""
+
+    def __init__(self, seconds):
+        """Average events over the last seconds."""
+        self.seconds = seconds
+        self.buckets = collections.deque()
+
+    def add(self, count, now):
+        """Record count events at unix time now."""
+        second = int(now)
+        if self.buckets and self.buckets[-1][0] == second:
+            self.buckets[-1][1] += count
+        else:
+            self.buckets.append([second, count])
+        self._expire(now)
+
+    def rate(self, now):
+        """Return the average events per second over the window."""
+        self._expire(now)
+        return sum(count for _, count in self.buckets) / float(self.seconds)
+
+    def _expire(self, now):
+        while self.buckets and self.buckets[0][0] <= now - self.seconds:
+            self.buckets.popleft()
+
+
+class Histogram:
+    """Cumulative histogram of observed values."""
+
+    def __init__(self, buckets):
+        """Count values into the given upper bounds plus +Inf."""
+        self.bounds = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        """Record one value."""
+        for index, bound in enumerate(self.bounds):
+            if value <= bound:
+                self.counts[index] += 1
+                break
+        else:
+            self.counts[-1] += 1
+        self.total += value
+        self.count += 1
+
+
+class MetricsRegistry:
+    """In-memory counters and histograms, collected only once enabled."""
+
+    def __init__(self):
+        """Create an empty, disabled registry."""
+        self.enabled = False
+        self.counters = collections.defaultdict(float)
+        self.rates = {}
+        self.histograms = {}
+        self._lock = threading.Lock()
+
+    def inc(self, name, labels=None, value=1):
+        """Add value to the counter name with labels."""
+        if not self.enabled:
+            return
+        with self._lock:
+            self.counters[(name, _label_key(labels))] += value
+
+    def inc_rate(self, name, labels=None, value=1):
+        """Add value to the rolling per-second rate name with labels."""
+        if not self.enabled:
+            return
+        key = (name, _label_key(labels))
+        with self._lock:
+            if key not in self.rates:
+                self.rates[key] = RateWindow(RATE_WINDOW)
+            self.rates[key].add(value, time.time())
+
+    def observe(self, name, value, labels=None):
+        """Record value in the histogram name with labels."""
+        if not self.enabled:
+            return
+        key = (name, _label_key(labels))
+        with self._lock:
+            if key not in self.histograms:
+                self.histograms[key] = Histogram(LATENCY_BUCKETS)
+            self.histograms[key].observe(value)
+
+    def render(self):
+        """Return all metrics in the Prometheus text exposition format."""
+        now = time.time()
+        samples = collections.defaultdict(list)
+        with self._lock:
+            for (name, labels), value in self.counters.items():
+                samples[name].append((name, labels, value))
+            for (name, labels), window in self.rates.items():
+                samples[name].append((name, labels, window.rate(now)))
+            for (name, labels), histogram in self.histograms.items():
+                cumulative = 0
+                bounds = list(histogram.bounds) + ["+Inf"]
+                for bound, count in zip(bounds, histogram.counts):
+                    cumulative += count
+                    samples[name].append(
+                        (
+                            name + "_bucket",
+                            labels + (("le", str(bound)),),
+                            cumulative,
+                        )
+                    )
+                samples[name].append(
+                    (name + "_sum", labels, histogram.total)
+                )
+                samples[name].append(
+                    (name + "_count", labels, histogram.count)
+                )
+
+        lines = []
+        for name in sorted(samples):
+            metric_type, description = HELP[name]
+            full_name = METRIC_PREFIX + name
+            lines.append("# HELP {} {}".format(full_name, description))
+            lines.append("# TYPE {} {}".format(full_name, metric_type))
+            for sample_name, labels, value in samples[name]:
+                lines.append(
+                    "{}{}{} {}".format(
+                        METRIC_PREFIX,
+                        sample_name,
+                        _format_labels(labels),
+                        value,
+                    )
+                )
+        return "\n".join(lines) + "\n"
+
+
+def _label_key(labels):
+    return tuple(sorted((labels or {}).items()))
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    pairs = [
+        '{}="{}"'.format(
+            key,
+            str(value)
+            .replace("\\", "\\\\")
+            .replace('"', '\\"')
+            .replace("\n", "\\n"),
+        )
+        for key, value in labels
+    ]
+    return "{" + ",".join(pairs) + "}"
+
+
+REGISTRY = MetricsRegistry()
+
+
+class MetricsExporter:
+    """Periodically write the registry to a file for node exporter."""
+
+    def __init__(self, path, interval, registry=REGISTRY):
+        """Write registry to path every interval seconds once started."""
+        self.path = path
+        self.interval = interval
+        self.registry = registry
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name="metrics-exporter", daemon=True
+        )
+
+    def start(self):
+        """Enable collection and start writing the metrics file."""
+        LOGGER.info("Exporting metrics to %s", self.path)
+        self.registry.enabled = True
+        self._thread.start()
+
+    def stop(self):
+        """Stop the writer thread after a final write."""
+        self._stopped.set()
+        self._thread.join()
+        self._write_logging_errors()
+
+    def write(self):
+        """Atomically replace the metrics file with the current metrics."""
+        temp_path = self.path + ".tmp"
+        with open(temp_path, "w") as metrics_file:
+            metrics_file.write(self.registry.render())
+        os.replace(temp_path, self.path)
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            self._write_logging_errors()
+
+    def _write_logging_errors(self):
+        # Metrics are best effort, so never fail the sync over them
+        try:
+            self.write()
+        except OSError as exception:
+            LOGGER.warning("Could not write metrics file: %s", exception)
+
+
+@contextlib.contextmanager
+def http_request_timer(endpoint):
+    """Time a request with singer metrics and the latency histogram."""
+    started = time.monotonic()
+    try:
+        with metrics.http_request_timer(endpoint) as timer:
+            yield timer
+    finally:
+        REGISTRY.observe(
+            "request_duration_seconds",
+            time.monotonic() - started,
+            {"endpoint": endpoint},
+        )
+
+
+def count_retry(details):
+    """Count a retry, as a backoff on_backoff handler."""
+    REGISTRY.inc("retries_total", {"function": details["target"].__name__})
+
+
+def count_records(stream_name, count=1, account=None):
+    """Count records written for a stream of an account."""
+    labels = {"stream": stream_name}
+    if account:
+        labels["account"] = account
+    REGISTRY.inc("records_total", labels, count)
+    REGISTRY.inc_rate("records_per_second", labels, count)
@@ -0,0 +1,119 @@
+"""Hedged requests to cut the tail latency of slow report calls."""
+import collections
+from concurrent import futures
+import math
+import threading
+import time
+
+import singer
+from singer import metrics
+from tap_criteo.exporter import REGISTRY
+
+
+LOGGER = singer.get_logger()
+
+HEDGE_WINDOW = 100  # Number of recent latencies the percentile is taken from
+HEDGE_MIN_SAMPLES = 5  # Latencies needed before any request is hedged
+
+
+class Hedger:
+    """Send a duplicate request when the first one is unusually slow.
+
+    A request which is still running after the configured percentile of
+    recent latencies gets a duplicate, and whichever returns first wins.
+    At most max_hedges duplicates are sent over the Hedger's lifetime.
+    """
+
+    def __init__(self, percentile, max_hedges, endpoint=None):
+        """Hedge past the given latency percentile, max_hedges times."""
+        self.percentile = percentile
+        self.max_hedges = max_hedges
+        self.endpoint = endpoint
+        self.hedges_sent = 0
+        self.hedges_won = 0
+        self._latencies = collections.deque(maxlen=HEDGE_WINDOW)
+        self._lock = threading.Lock()
+
+    def threshold(self):
+        """Return the latency after which a request is hedged, or None."""
+        with self._lock:
+            if len(self._latencies) < HEDGE_MIN_SAMPLES:
+                return None
+            latencies = sorted(self._latencies)
+        index = math.ceil(self.percentile / 100.0 * len(latencies)) - 1
+        return latencies[min(max(index, 0), len(latencies) - 1)]
+
+    def _acquire_hedge(self):
+        with self._lock:
+            if self.hedges_sent >= self.max_hedges:
+                return False
+            self.hedges_sent += 1
+            return True
+
+    def _timed(self, request):
+        started = time.monotonic()
+        result = request()
+        with self._lock:
+            self._latencies.append(time.monotonic() - started)
+        return result
+
+    def _submit(self, request):
+        # Daemon threads, so a hung losing request cannot keep the tap alive
+        future = futures.Future()
+
+        def run():
+            future.set_running_or_notify_cancel()
+            try:
+                future.set_result(self._timed(request))
+            except Exception as exception:  # pylint: disable=broad-except
+                future.set_exception(exception)
+
+        threading.Thread(target=run, name="hedge", daemon=True).start()
+        return future
+
+    def call(self, request, throttle=None):
+        """Return the result of request(), hedging it if it is slow.
+
+        throttle is called before each request is sent so that rate limit
+        waits are not counted as request latency.
+        """
+        threshold = self.threshold()
+        if throttle:
+            throttle()
+        if threshold is None:
+            return self._timed(request)
+
+        primary = self._submit(request)
+        done, _ = futures.wait([primary], timeout=threshold)
+        if done or not self._acquire_hedge():
+            return primary.result()
+
+        LOGGER.info(
+            "Hedging %s request still running after %.1fs",
+            self.endpoint,
+            threshold,
+        )
+        if throttle:
+            throttle()
+        hedge = self._submit(request)
+        error = None
+        for future in futures.as_completed([primary, hedge]):
+            if future.exception() is not None:
+                error = error or future.exception()
+                continue
+            winner = "hedge" if future is hedge else "primary"
+            if future is hedge:
+                with self._lock:
+                    self.hedges_won += 1
+            REGISTRY.inc("hedged_requests_total", {"winner": winner})
+            metrics.log(
+                LOGGER,
+                metrics.Point(
+                    "counter",
+                    "hedged_request",
+                    1,
+                    {metrics.Tag.endpoint: self.endpoint, "winner": winner},
+                ),
+            )
+            return future.result()
+        raise error
@@ -0,0 +1,39 @@
+"""Singer output shared by accounts which sync concurrently."""
+import threading
+
+import singer
+from singer import bookmarks
+from tap_criteo import exporter
+
+
+# Serialises messages on stdout and changes to the shared state
+OUTPUT_LOCK = threading.RLock()
+
+
+def write_schema(stream_name, schema, key_properties, **kwargs):
+    """Output a Singer SCHEMA message."""
+    with OUTPUT_LOCK:
+        singer.write_schema(stream_name, schema, key_properties, **kwargs)
+
+
+def write_record(stream_name, record, time_extracted=None, account=None):
+    """Output a Singer RECORD message, counted towards account."""
+    with OUTPUT_LOCK:
+        singer.write_record(
+            stream_name, record, time_extracted=time_extracted
+        )
+    exporter.count_records(stream_name, account=account)
+
+
+def write_bookmark(state, state_key, key, value):
+    """Set a bookmark and output the updated Singer State."""
+    with OUTPUT_LOCK:
+        bookmarks.write_bookmark(state, state_key, key, value)
+        singer.write_state(state)
+
+
+def clear_bookmark(state, state_key, key):
+    """Remove a bookmark and output the updated Singer State."""
+    with OUTPUT_LOCK:
+        bookmarks.clear_bookmark(state, state_key, key)
+        singer.write_state(state)
@@ -0,0 +1,76 @@
+"""Per-stream execution plans which stay fixed for a whole sync."""
+from dateutil.relativedelta import relativedelta
+from singer import utils
+
+
+class StreamPlan:
+    """Everything needed to sync one stream, computed once per run.
+
+    Statistics streams fill in the query template, the CSV header mapping
+    and the date window. Generic streams only need the fields and the
+    number of calls they make.
+    """
+
+    # pylint: disable=too-many-instance-attributes
+
+    def __init__(self, stream, state_key, field_list, api_calls=1):
+        """Create a plan for stream with bookmarks under state_key."""
+        self.stream = stream
+        self.state_key = state_key
+        self.field_list = field_list
+        self.api_calls = api_calls
+        self.schema = stream.schema.to_dict()
+        self.report_dimensions = []
+        self.report_metrics = []
+        self.query_template = {}
+        self.header_mapping = {}
+        self.start_date = None
+        self.end_date = None
+        self.bookmark_date = None
+
+    def days(self):
+        """Yield each day of the plan's date window."""
+        day = self.start_date
+        while day <= self.end_date:
+            yield day
+            day = day + relativedelta(days=1)
+
+    def day_count(self):
+        """Return the number of days in the plan's date window."""
+        if self.start_date is None or self.start_date > self.end_date:
+            return 0
+        return (self.end_date - self.start_date).days + 1
+
+    def query_for_day(self, day):
+        """Return a Statistics query for a single day."""
+        stats_query = dict(self.query_template)
+        stats_query["start_date"] = day.strftime("%Y-%m-%d")
+        stats_query["end_date"] = day.strftime("%Y-%m-%d")
+        return stats_query
+
+    def expected_api_calls(self):
+        """Return the number of report or endpoint calls the plan makes."""
+        if self.start_date is None:
+            return self.api_calls
+        return self.day_count()
+
+    def to_dict(self):
+        """Describe the plan for --explain output."""
+        description = {
+            "stream": self.stream.stream,
+            "state_key": self.state_key,
+            "fields": self.field_list,
+            "api_calls": self.expected_api_calls(),
+        }
+        if self.start_date is not None:
+            description.update(
+                {
+                    "dimensions": self.report_dimensions,
+                    "metrics": self.report_metrics,
+                    "query": self.query_template,
+                    "start_date": utils.strftime(self.start_date),
+                    "end_date": utils.strftime(self.end_date),
+                    "days": self.day_count(),
+                }
+            )
+        return description
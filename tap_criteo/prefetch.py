@@ -0,0 +1,152 @@
+"""Bounded-memory prefetching of reports from Criteo Marketing API."""
+import collections
+import threading
+import time
+
+import singer
+from singer import metrics
+
+
+LOGGER = singer.get_logger()
+
+
+class ReportBuffer:
+    """FIFO of fetched reports bounded by their total size in bytes.
+
+    Only queued reports count towards the budget, not the one a blocked
+    producer is holding or the one the consumer is writing.
+    """
+
+    def __init__(self, budget_bytes):
+        """Create an empty buffer holding at most budget_bytes of reports."""
+        self.budget_bytes = budget_bytes
+        self.used_bytes = 0
+        self.closed = False
+        self.producer_stall = 0.0
+        self.consumer_stall = 0.0
+        self._items = collections.deque()
+        self._cond = threading.Condition()
+
+    def __len__(self):
+        """Return the number of reports waiting in the buffer."""
+        with self._cond:
+            return len(self._items)
+
+    def put(self, item, size):
+        """Add item, blocking while it would exceed the byte budget.
+
+        A report larger than the whole budget is still accepted once the
+        buffer is empty, otherwise it could never be handed over.
+        Return False if the buffer was closed while waiting.
+        """
+        with self._cond:
+            started = time.monotonic()
+            while (
+                not self.closed
+                and self.used_bytes
+                and self.used_bytes + size > self.budget_bytes
+            ):
+                self._cond.wait()
+            self.producer_stall += time.monotonic() - started
+            if self.closed:
+                return False
+            self._items.append((item, size))
+            self.used_bytes += size
+            self._cond.notify_all()
+            return True
+
+    def get(self):
+        """Remove and return the oldest item, blocking until one exists."""
+        with self._cond:
+            started = time.monotonic()
+            while not self._items:
+                self._cond.wait()
+            self.consumer_stall += time.monotonic() - started
+            item, size = self._items.popleft()
+            self.used_bytes -= size
+            self._cond.notify_all()
+            return item
+
+    def close(self):
+        """Stop accepting items and wake up a blocked producer."""
+        with self._cond:
+            self.closed = True
+            self._cond.notify_all()
+
+
+_DONE = object()
+
+
+def report_size(report):
+    """Return the approximate in-memory size of a report in bytes."""
+    if isinstance(report, str):
+        return len(report.encode("utf-8"))
+    return len(report)
+
+
+def produce(buffer, keys, fetch):
+    """Fetch each key into buffer, then add a done marker."""
+    try:
+        for key in keys:
+            if buffer.closed:
+                return
+            result = fetch(key)
+            if not buffer.put((key, result), report_size(result)):
+                return
+    except Exception as exception:  # pylint: disable=broad-except
+        buffer.put((_DONE, exception), 0)
+        return
+    buffer.put((_DONE, None), 0)
+
+
+def log_stall_metrics(buffer, tags):
+    """Log how long the producer and consumer waited on each other."""
+    metrics.log(
+        LOGGER,
+        metrics.Point(
+            "timer", "prefetch_consumer_stall", buffer.consumer_stall, tags
+        ),
+    )
+    metrics.log(
+        LOGGER,
+        metrics.Point(
+            "timer", "prefetch_producer_stall", buffer.producer_stall, tags
+        ),
+    )
+
+
+def prefetch(keys, fetch, budget_bytes, endpoint=None):
+    """Yield (key, fetch(key)) in order, fetching ahead in a thread.
+
+    The producer thread keeps fetching while the caller transforms and
+    writes earlier reports, but stops once budget_bytes of unconsumed
+    reports are buffered. Exceptions raised by fetch are re-raised in the
+    caller. Closing the generator, e.g. with contextlib.closing, stops the
+    producer after its current request.
+    """
+    buffer = ReportBuffer(budget_bytes)
+    tags = {metrics.Tag.endpoint: endpoint}
+    producer = threading.Thread(
+        target=produce,
+        args=(buffer, keys, fetch),
+        name="prefetch-{}".format(endpoint),
+        daemon=True,
+    )
+    producer.start()
+    try:
+        while True:
+            key, result = buffer.get()
+            if key is _DONE:
+                if result is not None:
+                    raise result
+                break
+            metrics.log(
+                LOGGER,
+                metrics.Point(
+                    "gauge", "prefetch_queue_depth", len(buffer), tags
+                ),
+            )
+            yield key, result
+    finally:
+        buffer.close()
+        log_stall_metrics(buffer, tags)
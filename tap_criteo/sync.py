@@ -1,7 +1,10 @@
 """Logic to sync tap."""
+from concurrent import futures
+import contextlib
 import copy
 import csv
 import io
+import time
 
 from dateutil.relativedelta import relativedelta
 import singer
@@ -11,6 +14,10 @@ from singer import metrics
 from singer import Schema
 from singer import Transformer
 from singer import utils
+from tap_criteo import exporter
+from tap_criteo import output
+from tap_criteo.budget import BudgetedDays, RunBudget
+from tap_criteo.columnar import convert_columns, record_batches
 from tap_criteo.criteo import (
     create_sdk_client,
     get_audiences_endpoint,
@@ -23,6 +30,8 @@ from tap_criteo.endpoints import (
     SELLER_STATS_REPORT_TYPES,
     STATISTICS_REPORT_TYPES,
 )
+from tap_criteo.plan import StreamPlan
+from tap_criteo.prefetch import prefetch, report_size
 
 
 CSV_DELIMITER = ";"
@@ -31,21 +40,17 @@ LOGGER = singer.get_logger()
 REPORT_RUN_DATETIME = utils.strftime(utils.now())
 
 
-def get_attribution_window_bookmark(state, advertiser_ids, stream_name):
+def get_attribution_window_bookmark(state, state_key):
     """Get attribution window for stream from Singer State."""
     mid_bk_value = bookmarks.get_bookmark(
-        state,
-        state_key_name(advertiser_ids, stream_name),
-        "last_attribution_window_date",
+        state, state_key, "last_attribution_window_date"
     )
     return utils.strptime_with_tz(mid_bk_value) if mid_bk_value else None
 
 
-def get_start_for_stream(config, state, advertiser_ids, stream_name):
+def get_start_for_stream(config, state, state_key):
     """Get start date for stream sync."""
-    bk_value = bookmarks.get_bookmark(
-        state, state_key_name(advertiser_ids, stream_name), "date"
-    )
+    bk_value = bookmarks.get_bookmark(state, state_key, "date")
     bk_start_date = utils.strptime_with_tz(bk_value or config["start_date"])
     return bk_start_date
 
@@ -72,6 +77,35 @@ def state_key_name(advertiser_ids, stream_name):
         return stream_name
 
 
+def get_state_key(config, stream_name):
+    """Generate Singer State key for stream, namespaced by account."""
+    state_key = state_key_name(config.get("advertiser_ids", ""), stream_name)
+    if config.get("account_name"):
+        return config["account_name"] + "_" + state_key
+    return state_key
+
+
+def get_account_name(config):
+    """Return the name of the account config syncs, as used in metrics."""
+    return config.get("account_name", config["client_id"])
+
+
+def get_account_configs(config):
+    """Return one config per set of credentials to sync."""
+    if not config.get("accounts"):
+        return [config]
+
+    account_configs = []
+    for account in config["accounts"]:
+        account_config = {k: v for k, v in config.items() if k != "accounts"}
+        account_config.update(account)
+        account_config["account_name"] = account.get(
+            "name", account["client_id"]
+        )
+        account_configs.append(account_config)
+    return account_configs
+
+
 def should_sync(mdata, field):
     """Return True if field should be synced."""
     inclusion = metadata.get(mdata, field, "inclusion")
@@ -150,16 +184,23 @@ def add_synthetic_keys_to_stream_metadata(stream):
     return stream
 
 
-def parse_csv_string(mdata, csv_string):
+def get_csv_header_mapping(mdata):
+    """Map CSV headers to the Schema properties they belong to."""
+    return {
+        v.get("tap-criteo.col-name"): k[1]
+        for k, v in mdata.items()
+        if v.get("tap-criteo.col-name")
+    }
+
+
+def parse_csv_string(header_mapping, csv_string):
     """Parse CSV string into iterable of dictionaries."""
     # Remove BOM
     csv_string = csv_string.lstrip("\ufeff")
     # Read a single line into a String, and parse the headers as a CSV
     headers = csv.reader(io.StringIO(csv_string), delimiter=CSV_DELIMITER)
     # Convert headers to match Schema from metadata
-    header_mapping = {v.get("tap-criteo.col-name"): k for k, v in mdata.items()}
-    header_array = list(headers)[0]
-    header_array = [header_mapping[header][1] for header in header_array]
+    header_array = [header_mapping[header] for header in next(headers)]
 
     # Create another CSV reader for the rest of the data
     csv_reader = csv.DictReader(
@@ -171,168 +212,239 @@ def parse_csv_string(mdata, csv_string):
     return csv_reader
 
 
-def sync_statistics_report(config, state, stream, sdk_client, token):
-    """Sync a stream which is backed by the Criteo Statistics endpoint."""
+def parse_csv_columns(header_mapping, csv_string, field_list):
+    """Parse CSV string into columns of the selected fields."""
+    # Remove BOM
+    csv_string = csv_string.lstrip("\ufeff")
+    csv_reader = csv.reader(io.StringIO(csv_string), delimiter=CSV_DELIMITER)
+    header_array = [header_mapping[header] for header in next(csv_reader)]
+    # Skip blank lines and fill short rows with None like csv.DictReader
+    # does, then transpose to columns
+    width = len(header_array)
+    data = list(
+        zip(
+            *[
+                row + [None] * (width - len(row))
+                for row in csv_reader
+                if row
+            ]
+        )
+    )
+    row_count = len(data[0]) if data else 0
+    columns = {
+        field: data[index] if data else ()
+        for index, field in enumerate(header_array)
+        if field in field_list
+    }
+    return columns, row_count
+
+
+def get_date_window(config, state, state_key):
+    """Return the date bookmark and first and last day of a Statistics sync."""
+    bookmark_date = get_start_for_stream(config, state, state_key)
+    # If an attribution window sync is interrupted, start where it left off
+    start_date = get_attribution_window_bookmark(state, state_key)
+    if start_date is None:
+        start_date = apply_conversion_window(config, bookmark_date)
+    return bookmark_date, start_date, get_end_date(config)
+
+
+def compile_statistics_plan(config, state, stream):
+    """Compile the plan for a stream backed by the Statistics endpoint."""
     advertiser_ids = config.get("advertiser_ids", "")
     mdata = metadata.to_map(stream.metadata)
 
     stream = add_synthetic_keys_to_stream_schema(stream)
 
-    field_list = get_field_list(stream)
-
-    primary_keys = []
-    LOGGER.info("{} primary keys are {}".format(stream.stream, primary_keys))
-    singer.write_schema(
-        stream.stream,
-        stream.schema.to_dict(),
-        primary_keys,
-        bookmark_properties=["Day"],
+    plan = StreamPlan(
+        stream, get_state_key(config, stream.stream), get_field_list(stream)
     )
 
-    # If an attribution window sync is interrupted, start where it left off
-    start_date = get_attribution_window_bookmark(
-        state, advertiser_ids, stream.stream
+    plan.bookmark_date, plan.start_date, plan.end_date = get_date_window(
+        config, state, plan.state_key
     )
-    if start_date is None:
-        start_date = apply_conversion_window(
-            config,
-            get_start_for_stream(
-                config, state, advertiser_ids, stream.stream
-            ),
-        )
 
     # According to Criteo's documentation the StatisticsApi only supports
     # between one and three dimensions and at least one metric.
-    report_dimensions = [
+    plan.report_dimensions = [
         field
-        for field in field_list
+        for field in plan.field_list
         if metadata.get(mdata, ("properties", field), "tap-criteo.behaviour")
         == "dimension"
     ]
-    LOGGER.info("Selected dimensions: %s", report_dimensions)
-    if not 0 <= len(report_dimensions) <= 3:
+    LOGGER.info("Selected dimensions: %s", plan.report_dimensions)
+    if not 0 <= len(plan.report_dimensions) <= 3:
         raise ValueError(
             "%s stream only supports up to 3 selected dimensions"
             % stream.stream
         )
-    report_metrics = [
+    plan.report_metrics = [
         field
-        for field in field_list
-        if metadata.get(mdata, ("properties", field), "tap-criteo.behaviour") == "metric"
+        for field in plan.field_list
+        if metadata.get(mdata, ("properties", field), "tap-criteo.behaviour")
+        == "metric"
     ]
-    LOGGER.info("Selected metrics: %s", report_metrics)
-    if not len(report_metrics) >= 1:
+    LOGGER.info("Selected metrics: %s", plan.report_metrics)
+    if not len(plan.report_metrics) >= 1:
         raise ValueError(
             "%s stream must have at least 1 selected metric" % stream.stream
         )
 
-    while start_date <= get_end_date(config):
-        token = refresh_auth_token(sdk_client, token)
-        sync_statistics_for_day(
-            config,
-            state,
-            stream,
-            sdk_client,
-            token,
-            start_date,
-            report_metrics,
-            report_dimensions,
+    plan.query_template = {
+        "report_type": stream.tap_stream_id,
+        "dimensions": plan.report_dimensions,
+        "metrics": plan.report_metrics,
+        "currency": metadata.get(mdata, (), "currency"),
+    }
+    # Filter advertiser_ids if defined in config
+    if advertiser_ids:
+        plan.query_template["advertiserId"] = advertiser_ids
+    # Add ignore_x_device if defined in metadata
+    ignore_x_device = metadata.get(mdata, (), "tap-criteo.ignoreXDevice")
+    if ignore_x_device:
+        plan.query_template["tap-criteo.ignoreXDevice"] = ignore_x_device
+
+    plan.header_mapping = get_csv_header_mapping(mdata)
+    return plan
+
+
+def sync_statistics_report(
+    config, state, stream, sdk_client, token, budget=None
+):
+    """Sync a stream which is backed by the Criteo Statistics endpoint.
+
+    Return False if the run budget ran out before the last day was synced.
+    """
+    advertiser_ids = config.get("advertiser_ids", "")
+    plan = compile_statistics_plan(config, state, stream)
+
+    primary_keys = []
+    LOGGER.info("{} primary keys are {}".format(stream.stream, primary_keys))
+    output.write_schema(
+        stream.stream, plan.schema, primary_keys, bookmark_properties=["Day"],
+    )
+
+    token_holder = [token]
+
+    def fetch(day):
+        token_holder[0] = refresh_auth_token(sdk_client, token_holder[0])
+        return fetch_statistics_for_day(plan, sdk_client, token_holder[0], day)
+
+    # Stop fetching at a day boundary once an average day no longer fits
+    # the budget, leaving the attribution window bookmark to resume from
+    days = BudgetedDays(plan.days(), budget) if budget else plan.days()
+    prefetch_bytes = int(config.get("prefetch_buffer_bytes", "0"))
+    if prefetch_bytes > 0:
+        # Overlap fetching the next days with writing the current one
+        reports = prefetch(
+            days, fetch, prefetch_bytes, endpoint=stream.tap_stream_id
         )
-        start_date = start_date + relativedelta(days=1)
-        bookmarks.write_bookmark(
+    else:
+        reports = ((day, fetch(day)) for day in days)
+
+    started = time.monotonic()
+    days_synced = 0
+    # Closing stops the prefetch producer even if writing a day fails
+    with contextlib.closing(reports):
+        for start_date, result in reports:
+            write_statistics_for_day(config, state, plan, start_date, result)
+            output.write_bookmark(
+                state,
+                plan.state_key,
+                "last_attribution_window_date",
+                (start_date + relativedelta(days=1)).strftime(
+                    utils.DATETIME_FMT
+                ),
+            )
+            days_synced += 1
+    # Recorded even when the budget runs out, so that a long backfill is
+    # ordered by its expected cost rather than treated as never timed
+    if days_synced:
+        output.write_bookmark(
             state,
-            state_key_name(advertiser_ids, stream.stream),
-            "last_attribution_window_date",
-            start_date.strftime(utils.DATETIME_FMT),
+            plan.state_key,
+            "seconds_per_day",
+            round((time.monotonic() - started) / days_synced, 2),
         )
-        singer.write_state(state)
-    bookmarks.clear_bookmark(
-        state,
-        state_key_name(advertiser_ids, stream.stream),
-        "last_attribution_window_date",
+    if budget and days.stopped_at is not None:
+        LOGGER.info(
+            "Run deadline reached, stopping %s before %s",
+            stream.stream,
+            days.stopped_at,
+        )
+        return False
+    output.clear_bookmark(
+        state, plan.state_key, "last_attribution_window_date",
     )
-    singer.write_state(state)
     LOGGER.info(
         "Done syncing the %s report for advertiser_ids %s",
         stream.stream,
         advertiser_ids,
     )
+    return True
 
 
-def sync_statistics_for_day(
-    config,
-    state,
-    stream,
-    sdk_client,
-    token,
-    start,
-    report_metrics,
-    report_dimensions,
-):  # pylint: disable=too-many-locals
-    """Sync and output Criteo Statistics endpoint for one day."""
-    mdata = metadata.to_map(stream.metadata)
-    stats_query = {
-        "report_type": stream.tap_stream_id,
-        "dimensions": report_dimensions,
-        "metrics": report_metrics,
-        "start_date": start.strftime("%Y-%m-%d"),
-        "end_date": start.strftime("%Y-%m-%d"),
-        "currency": metadata.get(mdata, (), "currency"),
-    }
-    # Filter advertiser_ids if defined in config
-    advertiser_ids = config.get("advertiser_ids")
-    if advertiser_ids:
-        stats_query["advertiserId"] = advertiser_ids
-    # Add ignore_x_device if defined in metadata
-    ignore_x_device = metadata.get(mdata, (), "tap-criteo.ignoreXDevice")
-    if ignore_x_device:
-        stats_query["tap-criteo.ignoreXDevice"] = ignore_x_device
+def fetch_statistics_for_day(plan, sdk_client, token, start):
+    """Fetch Criteo Statistics endpoint for one day as a CSV string."""
+    with exporter.http_request_timer(plan.stream.tap_stream_id):
+        result = get_statistics_report(
+            sdk_client, plan.query_for_day(start), token=token
+        )
+    # Measuring a report encodes it again, so skip it unless exported
+    if exporter.REGISTRY.enabled:
+        exporter.REGISTRY.inc(
+            "bytes_received_total",
+            {
+                "stream": plan.stream.stream,
+                "account": sdk_client.account_name,
+            },
+            report_size(result),
+        )
+    return result
 
-    # Fetch the report as a csv string
-    with metrics.http_request_timer(stream.tap_stream_id):
-        result = get_statistics_report(sdk_client, stats_query, token=token)
 
-    csv_reader = parse_csv_string(mdata, result)
+def write_statistics_for_day(config, state, plan, start, result):
+    """Output one day of a Criteo Statistics report and bookmark it."""
+    stream = plan.stream
     with metrics.record_counter(stream.tap_stream_id) as counter:
         time_extracted = utils.now()
+        account = get_account_name(config)
 
         with Transformer() as bumble_bee:
-            for row in csv_reader:
-                row["_sdc_report_datetime"] = REPORT_RUN_DATETIME
-                row["_sdc_report_currency"] = metadata.get(
-                    mdata, (), "currency"
+            if config.get("statistics_parse_mode") == "columnar":
+                write_statistics_columns(
+                    config, plan, result, bumble_bee, counter, time_extracted,
                 )
-                row = bumble_bee.transform(row, stream.schema.to_dict())
-
-                singer.write_record(
-                    stream.stream, row, time_extracted=time_extracted
-                )
-                counter.increment()
-
-        if start > get_start_for_stream(
-            config, state, advertiser_ids, stream.stream
-        ):
+            else:
+                for row in parse_csv_string(plan.header_mapping, result):
+                    row["_sdc_report_datetime"] = REPORT_RUN_DATETIME
+                    row["_sdc_report_currency"] = plan.query_template[
+                        "currency"
+                    ]
+                    row = bumble_bee.transform(row, plan.schema)
+
+                    output.write_record(
+                        stream.stream,
+                        row,
+                        time_extracted=time_extracted,
+                        account=account,
+                    )
+                    counter.increment()
+
+        if start > plan.bookmark_date:
             LOGGER.info(
-                "updating bookmark: %s > %s",
-                start,
-                get_start_for_stream(
-                    config, state, advertiser_ids, stream.stream
-                ),
+                "updating bookmark: %s > %s", start, plan.bookmark_date
             )
-            bookmarks.write_bookmark(
+            output.write_bookmark(
                 state,
-                state_key_name(advertiser_ids, stream.stream),
+                plan.state_key,
                 "date",
                 start.strftime(utils.DATETIME_FMT),
             )
-            singer.write_state(state)
+            plan.bookmark_date = start
         else:
             LOGGER.info(
-                "not updating bookmark: %s <= %s",
-                start,
-                get_start_for_stream(
-                    config, state, advertiser_ids, stream.stream
-                ),
+                "not updating bookmark: %s <= %s", start, plan.bookmark_date
             )
 
         LOGGER.info(
@@ -340,11 +452,40 @@ def sync_statistics_for_day(
             + "advertiser_ids %s on %s",
             counter.value,
             stream.stream,
-            advertiser_ids,
+            config.get("advertiser_ids"),
             start,
         )
 
 
+def write_statistics_columns(
+    config, plan, csv_string, transformer, counter, time_extracted
+):
+    """Output a Criteo Statistics report converted a column at a time."""
+    columns, row_count = parse_csv_columns(
+        plan.header_mapping, csv_string, set(plan.field_list)
+    )
+    columns = convert_columns(columns, plan.schema, transformer)
+    constants = {
+        "_sdc_report_datetime": REPORT_RUN_DATETIME,
+        "_sdc_report_currency": plan.query_template["currency"],
+    }
+    constants = {
+        field: transformer.transform(value, plan.schema["properties"][field])
+        for field, value in constants.items()
+    }
+    batch_size = int(config.get("columnar_batch_size", "1000"))
+    account = get_account_name(config)
+    for batch in record_batches(columns, row_count, constants, batch_size):
+        for row in batch:
+            output.write_record(
+                plan.stream.stream,
+                row,
+                time_extracted=time_extracted,
+                account=account,
+            )
+        counter.increment(len(batch))
+
+
 def sync_seller_v2_stats_report(config, state, stream, sdk_client, token):
     """Sync a stream which is backed by the Criteo SellerV2Stats endpoint."""
     pass
@@ -384,7 +525,7 @@ def call_generic_endpoint(
     stream, sdk_client, module, method, advertiser_ids=None, token=None
 ):
     """Call a generic Criteo Marketing API endpoint with Singer Metrics."""
-    with metrics.http_request_timer(stream.tap_stream_id):
+    with exporter.http_request_timer(stream.tap_stream_id):
         return get_generic_endpoint(
             sdk_client,
             module,
@@ -401,7 +542,7 @@ def sync_generic_endpoint(config, state, stream, sdk_client, token):
     mdata = metadata.to_map(stream.metadata)
     primary_keys = metadata.get(mdata, (), "table-key-properties") or []
     LOGGER.info("{} primary keys are {}".format(stream.stream, primary_keys))
-    singer.write_schema(stream.stream, stream.schema.to_dict(), primary_keys)
+    output.write_schema(stream.stream, stream.schema.to_dict(), primary_keys)
 
     advertiser_ids = config.get("advertiser_ids", None)
     if stream.tap_stream_id == "Audiences":
@@ -412,7 +553,7 @@ def sync_generic_endpoint(config, state, stream, sdk_client, token):
             )
         for advertiser_id in advertiser_ids.split(","):
             token = refresh_auth_token(sdk_client, token)
-            with metrics.http_request_timer(stream.tap_stream_id):
+            with exporter.http_request_timer(stream.tap_stream_id):
                 result = get_audiences_endpoint(
                     sdk_client, advertiser_id, token=token
                 )
@@ -443,14 +584,18 @@ def sync_generic_endpoint(config, state, stream, sdk_client, token):
 
     with metrics.record_counter(stream.tap_stream_id) as counter:
         time_extracted = utils.now()
+        account = get_account_name(config)
 
         with Transformer() as bumble_bee:
             for row in result:
                 row["_sdc_report_datetime"] = REPORT_RUN_DATETIME
                 row = bumble_bee.transform(row, stream.schema.to_dict())
 
-                singer.write_record(
-                    stream.stream, row, time_extracted=time_extracted
+                output.write_record(
+                    stream.stream,
+                    row,
+                    time_extracted=time_extracted,
+                    account=account,
                 )
                 counter.increment()
 
@@ -462,8 +607,8 @@ def sync_generic_endpoint(config, state, stream, sdk_client, token):
     )
 
 
-def sync_stream(config, state, stream, sdk_client):
-    """Sync a stream."""
+def sync_stream(config, state, stream, sdk_client, budget=None):
+    """Sync a stream, returning False if it was cut short by the budget."""
     # This bifurcation is real. Generic Endpoints have entirely different
     # performance characteristics and constraints than the Report
     # Endpoints and thus should be kept separate.
@@ -471,38 +616,193 @@ def sync_stream(config, state, stream, sdk_client):
     if stream.tap_stream_id in SELLER_STATS_REPORT_TYPES:
         sync_seller_v2_stats_report(config, state, stream, sdk_client, token)
     elif stream.tap_stream_id in STATISTICS_REPORT_TYPES:
-        sync_statistics_report(config, state, stream, sdk_client, token)
+        return sync_statistics_report(
+            config, state, stream, sdk_client, token, budget=budget
+        )
     elif stream.tap_stream_id in GENERIC_ENDPOINT_MAPPINGS:
         sync_generic_endpoint(config, state, stream, sdk_client, token)
     else:
         raise Exception(
             "Unrecognized tap_stream_id {}".format(stream.tap_stream_id)
         )
+    return True
 
 
-def do_sync(config, state, catalog):
-    """Sync all streams in Catalog based on State and Config."""
+def get_expected_cost(config, state, stream):
+    """Estimate the seconds a stream takes to sync from Singer State.
+
+    Statistics streams cost their recorded seconds per day times the days
+    left to sync, other streams their last sync duration. Return None for
+    a stream which has never been timed.
+    """
+    state_key = get_state_key(config, stream.stream)
+    if stream.tap_stream_id not in STATISTICS_REPORT_TYPES:
+        return bookmarks.get_bookmark(
+            state, state_key, "sync_duration_seconds"
+        )
+
+    seconds_per_day = bookmarks.get_bookmark(
+        state, state_key, "seconds_per_day"
+    )
+    if seconds_per_day is None:
+        return None
+    _, start_date, end_date = get_date_window(config, state, state_key)
+    return seconds_per_day * max((end_date - start_date).days + 1, 0)
+
+
+def order_streams_by_cost(config, state, streams):
+    """Order streams never timed first, then the rest cheapest first.
+
+    Every stream then gets timed on its first run instead of waiting
+    behind a partly synced backfill, which always has a cost.
+    """
+
+    def sort_key(stream):
+        cost = get_expected_cost(config, state, stream)
+        return (cost is not None, cost or 0)
+
+    return sorted(streams, key=sort_key)
+
+
+def compile_generic_plan(config, stream):
+    """Compile the plan for a stream backed by a generic Criteo endpoint."""
+    advertiser_ids = config.get("advertiser_ids", "")
+    stream = add_synthetic_keys_to_stream_schema(stream)
+    stream = add_synthetic_keys_to_stream_metadata(stream)
+    api_calls = 1
+    if stream.tap_stream_id == "Audiences":
+        api_calls = len(advertiser_ids.split(","))
+    return StreamPlan(
+        stream,
+        get_state_key(config, stream.stream),
+        get_fields_to_sync(stream),
+        api_calls=api_calls,
+    )
+
+
+def compile_stream_plan(config, state, stream):
+    """Compile the plan for a stream."""
+    if stream.tap_stream_id in SELLER_STATS_REPORT_TYPES:
+        # SellerV2Stats streams are not synced yet and make no calls
+        return StreamPlan(
+            stream,
+            get_state_key(config, stream.stream),
+            get_fields_to_sync(stream),
+            api_calls=0,
+        )
+    if stream.tap_stream_id in STATISTICS_REPORT_TYPES:
+        return compile_statistics_plan(config, state, stream)
+    if stream.tap_stream_id in GENERIC_ENDPOINT_MAPPINGS:
+        return compile_generic_plan(config, stream)
+    raise Exception(
+        "Unrecognized tap_stream_id {}".format(stream.tap_stream_id)
+    )
+
+
+def do_explain(config, state, catalog):
+    """Describe the sync of all selected streams without calling Criteo."""
+    streams = list(catalog.get_selected_streams(state))
+    plans = []
+    for account_config in get_account_configs(config):
+        for stream in copy.deepcopy(streams):
+            plan = compile_stream_plan(account_config, state, stream)
+            plans.append(plan.to_dict())
+    return {
+        "streams": plans,
+        # Every stream starts with a fresh token and more are fetched when
+        # one expires, so this is only a lower bound
+        "min_auth_calls": len(plans),
+        "api_calls": sum(plan["api_calls"] for plan in plans),
+    }
+
+
+def sync_account(config, state, streams, budget=None):
+    """Sync streams with the credentials and advertisers of one account."""
     sdk_client = create_sdk_client(config)
-    selected_streams = False
-    # Loop over streams in catalog
     advertiser_ids = config.get("advertiser_ids", "").split(",")
     if advertiser_ids:
         LOGGER.info("Syncing advertiser IDs %s ...", advertiser_ids)
     else:
         LOGGER.info("Syncing all advertiser IDs ...")
 
-    for stream in catalog.get_selected_streams(state):
-        selected_streams = True
-        LOGGER.info("Syncing stream: %s", stream.stream)
+    if budget:
+        # Cheapest first completes the most streams within the budget
+        streams = order_streams_by_cost(config, state, streams)
 
-        sync_stream(config, state, stream, sdk_client)
+    for stream in streams:
+        if budget and not budget.allows():
+            LOGGER.info(
+                "Run deadline reached, not syncing stream: %s", stream.stream
+            )
+            continue
+        cost = get_expected_cost(config, state, stream)
+        if (
+            budget
+            and cost is not None
+            and stream.tap_stream_id not in STATISTICS_REPORT_TYPES
+            and not budget.allows(cost)
+        ):
+            # Only Statistics streams can stop part way and resume later
+            LOGGER.info(
+                "Not syncing stream %s which took %ss, %ds of budget left",
+                stream.stream,
+                cost,
+                budget.remaining(),
+            )
+            continue
+        LOGGER.info("Syncing stream: %s", stream.stream)
 
-    if not selected_streams:
-        LOGGER.warn("No streams selected")
+        started = time.monotonic()
+        sync_stream(config, state, stream, sdk_client, budget=budget)
+        if stream.tap_stream_id not in STATISTICS_REPORT_TYPES:
+            output.write_bookmark(
+                state,
+                get_state_key(config, stream.stream),
+                "sync_duration_seconds",
+                round(time.monotonic() - started, 1),
+            )
 
     if advertiser_ids:
         LOGGER.info("Done syncing advertiser IDs %s ...", advertiser_ids)
     else:
         LOGGER.info("Done syncing all advertiser IDs ...")
 
-    return
+
+def do_sync(config, state, catalog):
+    """Sync all streams in Catalog based on State and Config."""
+    streams = list(catalog.get_selected_streams(state))
+    if not streams:
+        LOGGER.warn("No streams selected")
+        return
+
+    # Accounts share one process, worker pool and output but each gets its
+    # own copy of the streams since syncing adds synthetic keys to them
+    account_configs = get_account_configs(config)
+    workers = int(config.get("account_workers", "1"))
+    budget = None
+    if config.get("run_deadline_seconds"):
+        budget = RunBudget(float(config["run_deadline_seconds"]))
+    metrics_exporter = None
+    if config.get("metrics_file"):
+        metrics_exporter = exporter.MetricsExporter(
+            config["metrics_file"],
+            float(config.get("metrics_interval_seconds", "15")),
+        )
+        metrics_exporter.start()
+    try:
+        with futures.ThreadPoolExecutor(max_workers=workers) as executor:
+            jobs = [
+                executor.submit(
+                    sync_account,
+                    account_config,
+                    state,
+                    copy.deepcopy(streams),
+                    budget=budget,
+                )
+                for account_config in account_configs
+            ]
+            for job in jobs:
+                job.result()
+    finally:
+        if metrics_exporter:
+            metrics_exporter.stop()
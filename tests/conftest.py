@@ -0,0 +1,85 @@
+"""Shared fixtures for tap-criteo tests."""
+from types import SimpleNamespace
+
+import pytest
+from singer import metadata
+from singer.catalog import Catalog
+
+from tap_criteo import sync
+from tap_criteo.discover import do_discover
+
+
+CONFIG = {
+    "client_id": "id",
+    "client_secret": "secret",
+    "start_date": "2020-01-03T00:00:00Z",
+    "end_date": "2020-01-03T00:00:00Z",
+    "conversion_window_days": "-2",
+}
+
+
+def make_catalog(selections):
+    """Return a Catalog selecting the given fields of the given streams."""
+    streams = []
+    for stream in do_discover()["streams"]:
+        if stream["stream"] not in selections:
+            continue
+        mdata = metadata.to_map(stream["metadata"])
+        mdata = metadata.write(mdata, (), "selected", True)
+        # Statistics reports take their currency from the catalog
+        mdata = metadata.write(mdata, (), "currency", "USD")
+        for field in selections[stream["stream"]]:
+            mdata = metadata.write(
+                mdata, ("properties", field), "selected", True
+            )
+        stream["metadata"] = metadata.to_list(mdata)
+        streams.append(stream)
+    return Catalog.from_dict({"streams": streams})
+
+
+def make_report(day):
+    """Return a Statistics CSV report for day."""
+    return (
+        "\ufeffDay;Clicks;Impressions\n"
+        "{0};1;10\n"
+        "{0};2;20\n".format(day.strftime("%Y-%m-%d"))
+    )
+
+
+@pytest.fixture
+def config():
+    """Return a copy of a single-account config."""
+    return dict(CONFIG)
+
+
+@pytest.fixture
+def statistics_stream():
+    """Return a CampaignPerformance stream selecting Clicks and Displays."""
+    catalog = make_catalog({"CampaignPerformance": ["Clicks", "Displays"]})
+    return catalog.get_stream("CampaignPerformance")
+
+
+@pytest.fixture
+def fake_criteo(monkeypatch):
+    """Replace Criteo calls with canned reports, recording each day."""
+    requests = []
+
+    def get_statistics_report(client, stats_query, token=None):
+        requests.append(stats_query["start_date"])
+        return make_report(
+            sync.utils.strptime_with_tz(stats_query["start_date"])
+        )
+
+    monkeypatch.setattr(sync, "get_statistics_report", get_statistics_report)
+    monkeypatch.setattr(
+        sync, "get_generic_endpoint", lambda *args, **kwargs: []
+    )
+    monkeypatch.setattr(
+        sync, "refresh_auth_token", lambda client, token: "token"
+    )
+    monkeypatch.setattr(
+        sync,
+        "create_sdk_client",
+        lambda config: SimpleNamespace(account_name=config["client_id"]),
+    )
+    return requests
@@ -0,0 +1,34 @@
+"""Tests for the wall-clock budget of a run."""
+import time
+
+from tap_criteo.budget import BudgetedDays, RunBudget
+
+
+def test_run_budget_allows_work_that_fits():
+    budget = RunBudget(60)
+    assert 0 < budget.remaining() <= 60
+    assert budget.allows()
+    assert budget.allows(30)
+    assert not budget.allows(120)
+
+
+def test_expired_run_budget_allows_nothing():
+    budget = RunBudget(0)
+    assert budget.remaining() <= 0
+    assert not budget.allows()
+
+
+def test_budgeted_days_yields_all_days_within_budget():
+    days = BudgetedDays([1, 2, 3], RunBudget(60))
+    assert list(days) == [1, 2, 3]
+    assert days.stopped_at is None
+
+
+def test_budgeted_days_stops_when_average_day_does_not_fit():
+    days = BudgetedDays([1, 2, 3, 4], RunBudget(0.5))
+    synced = []
+    for day in days:
+        synced.append(day)
+        time.sleep(0.2)
+    assert synced == [1, 2]
+    assert days.stopped_at == 3
@@ -0,0 +1,106 @@
+"""Tests for column-at-a-time conversion of Statistics reports."""
+import datetime
+
+import pytest
+
+from tap_criteo import sync
+from tap_criteo.columnar import convert_column, record_batches
+
+
+HEADER_MAPPING = {"Day": "Day", "Clicks": "Clicks", "Impressions": "Displays"}
+DAY = datetime.datetime(2020, 1, 1, tzinfo=datetime.timezone.utc)
+
+
+def test_parse_csv_columns_selects_fields():
+    columns, row_count = sync.parse_csv_columns(
+        HEADER_MAPPING,
+        "\ufeffDay;Clicks;Impressions\n2020-01-01;1;10\n\n2020-01-01;2;20\n",
+        {"Day", "Displays"},
+    )
+    assert row_count == 2
+    assert columns == {
+        "Day": ("2020-01-01", "2020-01-01"),
+        "Displays": ("10", "20"),
+    }
+
+
+def test_parse_csv_columns_fills_short_rows_with_none():
+    columns, row_count = sync.parse_csv_columns(
+        HEADER_MAPPING,
+        "Day;Clicks;Impressions\n2020-01-01;7\n",
+        {"Clicks", "Displays"},
+    )
+    assert row_count == 1
+    assert columns == {"Clicks": ("7",), "Displays": (None,)}
+
+
+def test_parse_csv_columns_of_empty_report():
+    columns, row_count = sync.parse_csv_columns(
+        HEADER_MAPPING, "Day;Clicks;Impressions\n", {"Clicks"}
+    )
+    assert row_count == 0
+    assert columns == {"Clicks": ()}
+
+
+def test_convert_column_transforms_each_distinct_value_once():
+    calls = []
+
+    class CountingTransformer:
+        def transform(self, value, schema):
+            calls.append(value)
+            return value + "T00:00:00.000000Z"
+
+    converted = convert_column(
+        ["2020-01-01", "2020-01-01", "2020-01-02"],
+        {"type": ["null", "string"], "format": "date-time"},
+        CountingTransformer(),
+    )
+    assert converted == [
+        "2020-01-01T00:00:00.000000Z",
+        "2020-01-01T00:00:00.000000Z",
+        "2020-01-02T00:00:00.000000Z",
+    ]
+    assert calls == ["2020-01-01", "2020-01-02"]
+
+
+def test_record_batches_adds_constants():
+    batches = list(
+        record_batches(
+            {"a": [1, 2, 3], "b": [4, 5, 6]}, 3, {"c": "x"}, batch_size=2
+        )
+    )
+    assert batches == [
+        [{"a": 1, "b": 4, "c": "x"}, {"a": 2, "b": 5, "c": "x"}],
+        [{"a": 3, "b": 6, "c": "x"}],
+    ]
+
+
+def write_records(monkeypatch, config, plan, report):
+    records = []
+    monkeypatch.setattr(
+        sync.output,
+        "write_record",
+        lambda stream_name, record, **kwargs: records.append(record),
+    )
+    monkeypatch.setattr(sync.output, "write_bookmark", lambda *args: None)
+    sync.write_statistics_for_day(config, {}, plan, DAY, report)
+    return records
+
+
+@pytest.mark.parametrize(
+    "report",
+    [
+        "\ufeffDay;Clicks;Impressions\n2020-01-01;1;10\n2020-01-01;2;20\n",
+        "Day;Clicks;Impressions\n2020-01-01;7\n",
+        "Day;Clicks;Impressions\n",
+    ],
+)
+def test_columnar_records_equal_row_records(
+    monkeypatch, config, statistics_stream, report
+):
+    plan = sync.compile_statistics_plan(config, {}, statistics_stream)
+    rows = write_records(monkeypatch, config, plan, report)
+    config["statistics_parse_mode"] = "columnar"
+    config["columnar_batch_size"] = "1"
+    columns = write_records(monkeypatch, config, plan, report)
+    assert columns == rows
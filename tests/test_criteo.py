@@ -0,0 +1,67 @@
+"""Tests for per-account request handling."""
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from tap_criteo import criteo
+
+
+def test_rate_limiter_spaces_out_requests():
+    limiter = criteo.RateLimiter(20)
+    started = time.monotonic()
+    for _ in range(5):
+        limiter.wait()
+    # The first request goes straight away, then one every 0.05s
+    assert 0.2 <= time.monotonic() - started < 0.5
+
+
+def test_throttle_uses_rate_limiter_of_account(monkeypatch):
+    waits = []
+    limiter = criteo.RateLimiter(1)
+    monkeypatch.setattr(limiter, "wait", lambda: waits.append("a"))
+    monkeypatch.setattr(criteo, "RATE_LIMITERS", {"a": limiter})
+    criteo.throttle(SimpleNamespace(account_name="a"))
+    criteo.throttle(SimpleNamespace(account_name="b"))
+    assert waits == ["a"]
+
+
+def test_create_sdk_client_keys_rate_limit_by_account_name(monkeypatch):
+    monkeypatch.setattr(criteo, "RATE_LIMITERS", {})
+    client = criteo.create_sdk_client(
+        {
+            "client_id": "a",
+            "client_secret": "1",
+            "account_name": "x",
+            "requests_per_second": "2",
+        }
+    )
+    assert client.account_name == "x"
+    assert list(criteo.RATE_LIMITERS) == ["x"]
+    assert criteo.RATE_LIMITERS["x"].interval == 0.5
+
+
+@pytest.mark.parametrize("percentile", ["0", "-5", "150"])
+def test_create_sdk_client_rejects_invalid_hedge_percentile(percentile):
+    with pytest.raises(ValueError, match="hedge_percentile"):
+        criteo.create_sdk_client(
+            {
+                "client_id": "a",
+                "client_secret": "1",
+                "hedge_percentile": percentile,
+            }
+        )
+
+
+def test_create_sdk_client_registers_hedger(monkeypatch):
+    monkeypatch.setattr(criteo, "HEDGERS", {})
+    criteo.create_sdk_client(
+        {
+            "client_id": "a",
+            "client_secret": "1",
+            "hedge_percentile": "100",
+            "hedge_max_requests": "3",
+        }
+    )
+    assert criteo.HEDGERS["a"].percentile == 100
+    assert criteo.HEDGERS["a"].max_hedges == 3
@@ -0,0 +1,113 @@
+"""Tests for the Prometheus metrics exporter."""
+import pytest
+
+from tap_criteo import exporter, sync
+from tap_criteo.exporter import MetricsExporter, MetricsRegistry, RateWindow
+
+
+def test_rate_window_averages_recent_events():
+    window = RateWindow(10)
+    window.add(5, 100.0)
+    window.add(5, 100.5)
+    window.add(10, 105.0)
+    assert window.rate(105.0) == 2.0
+    # Events from second 100 leave the window ten seconds later
+    assert window.rate(110.0) == 1.0
+    assert window.rate(120.0) == 0.0
+
+
+def test_disabled_registry_records_nothing():
+    registry = MetricsRegistry()
+    registry.inc("retries_total")
+    registry.observe("request_duration_seconds", 1.0)
+    assert registry.render() == "\n"
+
+
+def test_render_prometheus_text_format():
+    registry = MetricsRegistry()
+    registry.enabled = True
+    registry.inc("records_total", {"stream": 'a"b', "account": "x"}, 2)
+    registry.observe("request_duration_seconds", 0.2, {"endpoint": "E"})
+    registry.observe("request_duration_seconds", 400, {"endpoint": "E"})
+    lines = registry.render().splitlines()
+    assert lines[:3] == [
+        "# HELP tap_criteo_records_total "
+        "Records written per stream and account.",
+        "# TYPE tap_criteo_records_total counter",
+        'tap_criteo_records_total{account="x",stream="a\\"b"} 2.0',
+    ]
+    assert "# TYPE tap_criteo_request_duration_seconds histogram" in lines
+    assert (
+        'tap_criteo_request_duration_seconds_bucket{endpoint="E",le="0.1"} 0'
+        in lines
+    )
+    assert (
+        'tap_criteo_request_duration_seconds_bucket{endpoint="E",le="0.25"} 1'
+        in lines
+    )
+    assert (
+        'tap_criteo_request_duration_seconds_bucket{endpoint="E",le="+Inf"} 2'
+        in lines
+    )
+    assert 'tap_criteo_request_duration_seconds_sum{endpoint="E"} 400.2' in (
+        lines
+    )
+    assert 'tap_criteo_request_duration_seconds_count{endpoint="E"} 2' in (
+        lines
+    )
+
+
+def test_count_records_labels_account(monkeypatch):
+    registry = MetricsRegistry()
+    registry.enabled = True
+    monkeypatch.setattr(exporter, "REGISTRY", registry)
+    exporter.count_records("Campaigns", account="x")
+    exporter.count_records("Campaigns")
+    assert registry.counters == {
+        ("records_total", (("account", "x"), ("stream", "Campaigns"))): 1,
+        ("records_total", (("stream", "Campaigns"),)): 1,
+    }
+
+
+@pytest.mark.parametrize("enabled", [True, False])
+def test_bytes_received_counted_per_account_only_when_enabled(
+    monkeypatch, config, statistics_stream, fake_criteo, enabled
+):
+    registry = MetricsRegistry()
+    registry.enabled = enabled
+    monkeypatch.setattr(exporter, "REGISTRY", registry)
+    measured = []
+    monkeypatch.setattr(
+        sync, "report_size", lambda report: measured.append(report) or 7
+    )
+    plan = sync.compile_statistics_plan(config, {}, statistics_stream)
+    client = sync.create_sdk_client(config)
+    sync.fetch_statistics_for_day(plan, client, "token", plan.start_date)
+    key = (
+        "bytes_received_total",
+        (("account", "id"), ("stream", "CampaignPerformance")),
+    )
+    assert registry.counters.get(key) == (7 if enabled else None)
+    assert len(measured) == (1 if enabled else 0)
+
+
+def test_stop_writes_metrics_a_final_time(tmp_path):
+    registry = MetricsRegistry()
+    path = str(tmp_path / "metrics.prom")
+    metrics_exporter = MetricsExporter(path, 60, registry=registry)
+    metrics_exporter.start()
+    registry.inc("retries_total", {"function": "f"})
+    metrics_exporter.stop()
+    with open(path) as metrics_file:
+        assert 'tap_criteo_retries_total{function="f"} 1' in (
+            metrics_file.read()
+        )
+    assert not (tmp_path / "metrics.prom.tmp").exists()
+
+
+def test_stop_logs_failed_final_write(tmp_path, caplog):
+    path = str(tmp_path / "missing" / "metrics.prom")
+    metrics_exporter = MetricsExporter(path, 60, registry=MetricsRegistry())
+    metrics_exporter.start()
+    metrics_exporter.stop()
+    assert "Could not write metrics file" in caplog.text
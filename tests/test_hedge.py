@@ -0,0 +1,73 @@
+"""Tests for hedged requests."""
+import time
+
+from tap_criteo.hedge import HEDGE_MIN_SAMPLES, Hedger
+
+
+def warm_up(hedger, seconds=0.01):
+    for _ in range(HEDGE_MIN_SAMPLES):
+        hedger.call(lambda: time.sleep(seconds))
+
+
+def test_no_threshold_until_enough_samples():
+    hedger = Hedger(90, 10)
+    for _ in range(HEDGE_MIN_SAMPLES - 1):
+        hedger.call(lambda: None)
+        assert hedger.threshold() is None
+    hedger.call(lambda: None)
+    assert hedger.threshold() is not None
+
+
+def test_threshold_is_percentile_of_latencies():
+    hedger = Hedger(50, 10)
+    hedger._latencies.extend([5.0, 1.0, 4.0, 2.0, 3.0])
+    assert hedger.threshold() == 3.0
+    hedger.percentile = 100
+    assert hedger.threshold() == 5.0
+
+
+def test_slow_request_is_hedged_and_hedge_wins():
+    hedger = Hedger(50, 10)
+    warm_up(hedger)
+    calls = []
+
+    def request():
+        calls.append(None)
+        if len(calls) == 1:
+            time.sleep(2)
+            return "primary"
+        return "hedge"
+
+    started = time.monotonic()
+    assert hedger.call(request) == "hedge"
+    assert time.monotonic() - started < 1
+    assert hedger.hedges_sent == 1
+    assert hedger.hedges_won == 1
+
+
+def test_hedges_are_capped():
+    hedger = Hedger(50, 0)
+    warm_up(hedger)
+    calls = []
+
+    def request():
+        calls.append(None)
+        time.sleep(0.1)
+        return "result"
+
+    assert hedger.call(request) == "result"
+    assert len(calls) == 1
+    assert hedger.hedges_sent == 0
+
+
+def test_throttle_is_not_counted_as_latency():
+    hedger = Hedger(50, 10)
+    for _ in range(HEDGE_MIN_SAMPLES):
+        hedger.call(lambda: None, throttle=lambda: time.sleep(0.05))
+    assert hedger.threshold() < 0.05
+
+
+def test_threshold_is_clamped_to_slowest_latency():
+    hedger = Hedger(150, 1)
+    hedger._latencies.extend([1.0, 2.0, 3.0, 4.0, 5.0])
+    assert hedger.threshold() == 5.0
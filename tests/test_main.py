@@ -0,0 +1,73 @@
+"""Tests for the command line interface."""
+import json
+import sys
+
+import pytest
+
+import tap_criteo
+
+
+def run_parse_args(monkeypatch, tmp_path, config, *args):
+    config_path = tmp_path / "config.json"
+    config_path.write_text(json.dumps(config))
+    monkeypatch.setattr(
+        sys, "argv", ["tap-criteo", "-c", str(config_path)] + list(args)
+    )
+    return tap_criteo.parse_args()
+
+
+def test_explain_requires_catalog(monkeypatch, tmp_path, config, capsys):
+    with pytest.raises(SystemExit):
+        run_parse_args(monkeypatch, tmp_path, config, "--explain")
+    assert "--explain requires --catalog" in capsys.readouterr().err
+
+
+def test_explain_prints_plan(monkeypatch, tmp_path, config, capsys):
+    catalog_path = tmp_path / "catalog.json"
+    catalog_path.write_text(json.dumps({"streams": []}))
+    run_parse_args(
+        monkeypatch,
+        tmp_path,
+        config,
+        "--explain",
+        "--catalog",
+        str(catalog_path),
+    )
+    tap_criteo.main()
+    assert json.loads(capsys.readouterr().out) == {
+        "streams": [],
+        "min_auth_calls": 0,
+        "api_calls": 0,
+    }
+
+
+@pytest.mark.parametrize(
+    "accounts",
+    [
+        [
+            {"client_id": "a", "client_secret": "1"},
+            {"client_id": "a", "client_secret": "2"},
+        ],
+        [
+            {"name": "x", "client_id": "a", "client_secret": "1"},
+            {"name": "x", "client_id": "b", "client_secret": "2"},
+        ],
+    ],
+)
+def test_duplicate_account_names_are_rejected(
+    monkeypatch, tmp_path, config, accounts
+):
+    config["accounts"] = accounts
+    with pytest.raises(Exception, match="unique names"):
+        run_parse_args(monkeypatch, tmp_path, config)
+
+
+def test_accounts_sharing_a_client_id_with_names_are_accepted(
+    monkeypatch, tmp_path, config
+):
+    config["accounts"] = [
+        {"name": "x", "client_id": "a", "client_secret": "1"},
+        {"name": "y", "client_id": "a", "client_secret": "2"},
+    ]
+    args = run_parse_args(monkeypatch, tmp_path, config)
+    assert len(args.config["accounts"]) == 2
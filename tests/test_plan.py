@@ -0,0 +1,94 @@
+"""Tests for per-stream sync plans and --explain."""
+import datetime
+
+import pytest
+
+from tap_criteo import sync
+from conftest import make_catalog
+
+
+UTC = datetime.timezone.utc
+
+
+def test_compile_statistics_plan(config, statistics_stream):
+    config["advertiser_ids"] = "1,2"
+    plan = sync.compile_statistics_plan(config, {}, statistics_stream)
+    assert plan.state_key == "CampaignPerformance_1,2"
+    assert plan.report_dimensions == ["Day"]
+    assert plan.report_metrics == ["Clicks", "Displays"]
+    assert plan.query_template == {
+        "report_type": "CampaignPerformance",
+        "dimensions": ["Day"],
+        "metrics": ["Clicks", "Displays"],
+        "currency": "USD",
+        "advertiserId": "1,2",
+    }
+    assert plan.header_mapping["Impressions"] == "Displays"
+    # The conversion window reaches two days back from the start date
+    assert plan.bookmark_date == datetime.datetime(2020, 1, 3, tzinfo=UTC)
+    assert list(plan.days()) == [
+        datetime.datetime(2020, 1, day, tzinfo=UTC) for day in (1, 2, 3)
+    ]
+    assert plan.query_for_day(plan.start_date)["end_date"] == "2020-01-01"
+
+
+def test_compile_statistics_plan_resumes_attribution_window(
+    config, statistics_stream
+):
+    state = {
+        "bookmarks": {
+            "CampaignPerformance": {
+                "date": "2020-01-03T00:00:00Z",
+                "last_attribution_window_date": "2020-01-02T00:00:00Z",
+            }
+        }
+    }
+    plan = sync.compile_statistics_plan(config, state, statistics_stream)
+    assert plan.day_count() == 2
+
+
+def test_compile_statistics_plan_requires_a_metric(config):
+    stream = make_catalog({"CampaignPerformance": []}).get_stream(
+        "CampaignPerformance"
+    )
+    with pytest.raises(ValueError, match="at least 1 selected metric"):
+        sync.compile_statistics_plan(config, {}, stream)
+
+
+def test_statistics_plan_to_dict(config, statistics_stream):
+    plan = sync.compile_statistics_plan(config, {}, statistics_stream)
+    assert plan.expected_api_calls() == 3
+    description = plan.to_dict()
+    assert description["api_calls"] == 3
+    assert description["days"] == 3
+    assert description["start_date"] == "2020-01-01T00:00:00.000000Z"
+    assert description["end_date"] == "2020-01-03T00:00:00.000000Z"
+    assert description["dimensions"] == ["Day"]
+
+
+def test_generic_plan_to_dict(config):
+    config["advertiser_ids"] = "1,2,3"
+    stream = make_catalog({"Audiences": []}).get_stream("Audiences")
+    plan = sync.compile_stream_plan(config, {}, stream)
+    assert plan.expected_api_calls() == 3
+    description = plan.to_dict()
+    assert description["api_calls"] == 3
+    assert "days" not in description
+
+
+def test_do_explain_sums_calls_without_calling_criteo(
+    monkeypatch, config
+):
+    monkeypatch.setattr(sync, "create_sdk_client", None)
+    monkeypatch.setattr(sync, "get_statistics_report", None)
+    catalog = make_catalog(
+        {"CampaignPerformance": ["Clicks"], "Campaigns": [], "Sellers": []}
+    )
+    explained = sync.do_explain(config, {}, catalog)
+    assert sorted(plan["stream"] for plan in explained["streams"]) == [
+        "CampaignPerformance",
+        "Campaigns",
+        "Sellers",
+    ]
+    assert explained["api_calls"] == 5
+    assert explained["min_auth_calls"] == 3
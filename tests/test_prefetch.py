@@ -0,0 +1,90 @@
+"""Tests for bounded-memory prefetching of reports."""
+import threading
+import time
+
+import pytest
+
+from tap_criteo.prefetch import ReportBuffer, prefetch, report_size
+
+
+def test_report_size_counts_utf8_bytes():
+    assert report_size("abc") == 3
+    assert report_size("é") == 2
+
+
+def test_put_blocks_until_get_frees_budget():
+    buffer = ReportBuffer(10)
+    assert buffer.put("first", 8)
+    added = threading.Event()
+
+    def put_second():
+        buffer.put("second", 8)
+        added.set()
+
+    threading.Thread(target=put_second, daemon=True).start()
+    assert not added.wait(0.1)
+    assert buffer.get() == "first"
+    assert added.wait(1)
+    assert buffer.get() == "second"
+    assert buffer.producer_stall > 0
+
+
+def test_put_accepts_oversized_item_into_empty_buffer():
+    buffer = ReportBuffer(10)
+    assert buffer.put("huge", 100)
+    assert buffer.used_bytes == 100
+    assert buffer.get() == "huge"
+    assert buffer.used_bytes == 0
+
+
+def test_close_wakes_blocked_producer():
+    buffer = ReportBuffer(10)
+    buffer.put("first", 10)
+    results = []
+    thread = threading.Thread(
+        target=lambda: results.append(buffer.put("second", 10)), daemon=True
+    )
+    thread.start()
+    time.sleep(0.05)
+    buffer.close()
+    thread.join(1)
+    assert results == [False]
+    assert len(buffer) == 1
+
+
+def test_prefetch_yields_in_order():
+    keys = [1, 2, 3, 4]
+    assert list(prefetch(keys, lambda key: "x" * key, 3)) == [
+        (1, "x"),
+        (2, "xx"),
+        (3, "xxx"),
+        (4, "xxxx"),
+    ]
+
+
+def test_prefetch_reraises_fetch_exception_after_earlier_results():
+    def fetch(key):
+        if key == 2:
+            raise ValueError("bad day")
+        return str(key)
+
+    reports = prefetch([1, 2, 3], fetch, 100)
+    assert next(reports) == (1, "1")
+    with pytest.raises(ValueError, match="bad day"):
+        next(reports)
+
+
+def test_closing_prefetch_early_stops_producer():
+    fetched = []
+
+    def fetch(key):
+        fetched.append(key)
+        return "report"
+
+    reports = prefetch(range(1000), fetch, 6)
+    assert next(reports) == (0, "report")
+    reports.close()
+    time.sleep(0.1)
+    count = len(fetched)
+    time.sleep(0.1)
+    assert len(fetched) == count < 1000
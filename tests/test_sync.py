@@ -0,0 +1,185 @@
+"""Tests for syncing streams."""
+import copy
+import time
+
+import pytest
+
+from tap_criteo import sync
+from conftest import make_catalog
+
+
+def test_failed_write_stops_prefetching(
+    monkeypatch, config, statistics_stream, fake_criteo
+):
+    config["conversion_window_days"] = "-30"
+    config["prefetch_buffer_bytes"] = "1000000"
+    get_report = sync.get_statistics_report
+
+    def slow_report(*args, **kwargs):
+        time.sleep(0.02)
+        return get_report(*args, **kwargs)
+
+    def fail(*args):
+        raise ValueError("write failed")
+
+    monkeypatch.setattr(sync, "get_statistics_report", slow_report)
+    monkeypatch.setattr(sync, "write_statistics_for_day", fail)
+    # Holding the traceback keeps the sync's frame, and its reports, alive
+    with pytest.raises(ValueError, match="write failed") as error:
+        sync.sync_statistics_report(
+            config, {}, statistics_stream, None, "token"
+        )
+    time.sleep(0.1)
+    fetched = len(fake_criteo)
+    time.sleep(0.1)
+    assert len(fake_criteo) == fetched < 31
+    assert error.traceback
+
+
+def test_get_account_configs_without_accounts(config):
+    assert sync.get_account_configs(config) == [config]
+
+
+def test_get_account_configs_override_shared_config(config):
+    config["advertiser_ids"] = "1"
+    config["accounts"] = [
+        {"client_id": "a", "client_secret": "1"},
+        {"name": "b", "client_id": "a", "client_secret": "2"},
+    ]
+    account_configs = sync.get_account_configs(config)
+    assert [c["account_name"] for c in account_configs] == ["a", "b"]
+    assert [c["client_secret"] for c in account_configs] == ["1", "2"]
+    assert all(c["advertiser_ids"] == "1" for c in account_configs)
+    assert all("accounts" not in c for c in account_configs)
+
+
+def test_get_state_key_is_namespaced_by_account(config):
+    assert sync.get_state_key(config, "Campaigns") == "Campaigns"
+    config["advertiser_ids"] = "1,2"
+    config["account_name"] = "b"
+    assert sync.get_state_key(config, "Campaigns") == "b_Campaigns_1,2"
+
+
+def test_accounts_keep_separate_bookmarks(config, fake_criteo):
+    config["account_workers"] = "2"
+    config["accounts"] = [
+        {"name": "x", "client_id": "a", "client_secret": "1"},
+        {"name": "y", "client_id": "a", "client_secret": "2"},
+    ]
+    catalog = make_catalog({"CampaignPerformance": ["Clicks"]})
+    state = {}
+    sync.do_sync(config, state, catalog)
+    assert sorted(state["bookmarks"]) == [
+        "x_CampaignPerformance",
+        "y_CampaignPerformance",
+    ]
+    assert len(fake_criteo) == 6
+
+
+
+class RequestBudget:
+    """RunBudget stand-in which runs out after a number of report requests."""
+
+    def __init__(self, requests, limit):
+        self.requests = requests
+        self.limit = len(requests) + limit
+
+    def allows(self, seconds=0.0):
+        return len(self.requests) < self.limit
+
+    def remaining(self):
+        return self.limit - len(self.requests)
+
+
+def test_statistics_report_stops_at_day_boundary_and_resumes(
+    config, statistics_stream, fake_criteo
+):
+    state = {}
+    assert not sync.sync_statistics_report(
+        config,
+        state,
+        statistics_stream,
+        None,
+        "token",
+        budget=RequestBudget(fake_criteo, 2),
+    )
+    assert fake_criteo == ["2020-01-01", "2020-01-02"]
+    bookmark = state["bookmarks"]["CampaignPerformance"]
+    assert (
+        bookmark["last_attribution_window_date"]
+        == "2020-01-03T00:00:00.000000Z"
+    )
+    assert bookmark["seconds_per_day"] >= 0
+
+    assert sync.sync_statistics_report(
+        config, state, statistics_stream, None, "token"
+    )
+    assert fake_criteo == ["2020-01-01", "2020-01-02", "2020-01-03"]
+    assert "last_attribution_window_date" not in bookmark
+
+
+def test_order_streams_by_cost_puts_untimed_streams_first(config):
+    state = {
+        "bookmarks": {
+            "CampaignPerformance": {"seconds_per_day": 1.0},
+            "Campaigns": {"sync_duration_seconds": 2.0},
+            "Budgets": {"sync_duration_seconds": 5.0},
+        }
+    }
+    catalog = make_catalog(
+        {
+            "Budgets": [],
+            "Campaigns": [],
+            "Sellers": [],
+            "CampaignPerformance": ["Clicks"],
+            "FacebookDPA": ["Clicks"],
+        }
+    )
+    ordered = sync.order_streams_by_cost(config, state, catalog.streams)
+    assert [stream.stream for stream in ordered] == [
+        "Sellers",
+        "FacebookDPA",
+        "Campaigns",
+        "CampaignPerformance",
+        "Budgets",
+    ]
+
+
+def test_untimed_streams_sync_alongside_partial_backfill(
+    config, fake_criteo
+):
+    config["start_date"] = "2020-01-01T00:00:00Z"
+    config["end_date"] = "2020-03-01T00:00:00Z"
+    # A backfill which already ran out of budget, and streams never timed
+    state = {
+        "bookmarks": {
+            "CampaignPerformance": {
+                "last_attribution_window_date": "2020-01-10T00:00:00Z",
+                "seconds_per_day": 0.05,
+            },
+            "FacebookDPA": {"date": "2020-03-01T00:00:00Z"},
+        }
+    }
+    catalog = make_catalog(
+        {
+            "Campaigns": [],
+            "CampaignPerformance": ["Clicks"],
+            "FacebookDPA": ["Clicks"],
+        }
+    )
+    for _ in range(2):
+        sync.sync_account(
+            config,
+            state,
+            copy.deepcopy(catalog.streams),
+            budget=RequestBudget(fake_criteo, 5),
+        )
+
+    bookmarks = state["bookmarks"]
+    assert "sync_duration_seconds" in bookmarks["Campaigns"]
+    assert "seconds_per_day" in bookmarks["FacebookDPA"]
+    assert "last_attribution_window_date" not in bookmarks["FacebookDPA"]
+    assert (
+        bookmarks["CampaignPerformance"]["last_attribution_window_date"]
+        > "2020-01-10"
+    )